@@ -3,33 +3,58 @@ FastAPI Backend for ESP32 Sensor Data with Twilio Alerts
 Receives sensor data, serves it to frontend, and sends alerts via Twilio
 """
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Deque
+from collections import deque
+from itertools import islice
+from dataclasses import dataclass
+import numpy as np
+import orjson
+from datetime import datetime
 import uvicorn
-from fastapi.responses import FileResponse
+import asyncio
+import time
+import operator
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 import os
+import html
+import hashlib
+import logging
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="IoT Sensor API", version="2.0.0")
+# Logging (set LOG_LEVEL=INFO or DEBUG for more detail)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'WARNING').upper(), format='%(levelname)s: %(message)s')
+logger = logging.getLogger(__name__)
 
-# Serve frontend static files
+# orjson handles datetime natively and is much faster than the stdlib encoder
+app = FastAPI(title="IoT Sensor API", version="2.0.0", default_response_class=ORJSONResponse)
+
+# Serve frontend static files. dashboard.html is read once here and served
+# from memory by /dashboard.
+_DASHBOARD_BYTES: Optional[bytes] = None
+_DASHBOARD_ETAG: Optional[str] = None
 try:
     frontend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend')
     if os.path.isdir(frontend_path):
         app.mount('/static', StaticFiles(directory=frontend_path), name='static')
-        print(f"✅ Frontend path configured: {frontend_path}")
+        logger.info("✅ Frontend path configured: %s", frontend_path)
+        html_path = os.path.join(frontend_path, 'dashboard.html')
+        if os.path.isfile(html_path):
+            with open(html_path, 'rb') as f:
+                _DASHBOARD_BYTES = f.read()
+            _DASHBOARD_ETAG = f'"{hashlib.md5(_DASHBOARD_BYTES).hexdigest()}"'
     else:
-        print(f"⚠ Frontend directory not found: {frontend_path}")
+        logger.warning("⚠ Frontend directory not found: %s", frontend_path)
         frontend_path = None
 except Exception as e:
-    print(f"⚠ Could not mount frontend static files: {e}")
+    logger.warning("⚠ Could not mount frontend static files: %s", e)
     frontend_path = None
 
 # CORS Middleware
@@ -41,6 +66,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses such as /readings; level 1 keeps CPU cost low
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
 # -----------------------------
 # Twilio Configuration
 # -----------------------------
@@ -49,6 +77,9 @@ TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
 ALERT_PHONE_NUMBER = os.getenv('ALERT_PHONE_NUMBER')
 
+# TwiML for voice alerts; the alert message is escaped into the first <Say>
+TWIML_TEMPLATE = '<Response><Say voice="alice">{}</Say><Pause length="1"/><Say voice="alice">This is an automated alert from your IoT sensor system. Please check your dashboard immediately.</Say></Response>'
+
 # Initialize Twilio client
 twilio_client = None
 try:
@@ -56,15 +87,37 @@ try:
         from twilio.rest import Client
         from twilio.base.exceptions import TwilioRestException
         twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        print("✅ Twilio client initialized successfully")
+        logger.info("✅ Twilio client initialized successfully")
 except ImportError:
-    print("⚠ Twilio package not installed. Run: pip install twilio")
+    logger.warning("⚠ Twilio package not installed. Run: pip install twilio")
 except Exception as e:
-    print(f"⚠ Failed to initialize Twilio: {e}")
+    logger.warning("⚠ Failed to initialize Twilio: %s", e)
 
 if not twilio_client:
-    print("⚠ Twilio credentials not found. Alerts will be disabled.")
-    print("💡 Create a .env file with TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER, ALERT_PHONE_NUMBER")
+    logger.warning("⚠ Twilio credentials not found. Alerts will be disabled.")
+    logger.warning("💡 Create a .env file with TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER, ALERT_PHONE_NUMBER")
+
+# -----------------------------
+# Redis Configuration
+# -----------------------------
+REDIS_URL = os.getenv('REDIS_URL')
+REDIS_PREFIX = os.getenv('REDIS_PREFIX', 'iot:')
+READINGS_KEY = f'{REDIS_PREFIX}readings'
+ALERTS_KEY = f'{REDIS_PREFIX}alerts'
+COOLDOWN_PREFIX = f'{REDIS_PREFIX}cooldown:'
+SETTINGS_KEY = f'{REDIS_PREFIX}alert_settings'
+
+# Initialize Redis client (shared state across workers)
+redis_client = None
+try:
+    if REDIS_URL:
+        import redis.asyncio as aioredis
+        redis_client = aioredis.from_url(REDIS_URL)
+        logger.info("✅ Redis storage configured")
+except ImportError:
+    logger.warning("⚠ Redis package not installed. Run: pip install redis")
+except Exception as e:
+    logger.warning("⚠ Failed to initialize Redis: %s", e)
 
 # Alert Thresholds
 THRESHOLDS = {
@@ -75,7 +128,22 @@ THRESHOLDS = {
     'air_quality_max': float(os.getenv('AIR_QUALITY_MAX', 70.0)),
 }
 
+# Threshold checks: (sensor, comparison, settings key, alert type, label, unit)
+ALERT_CHECKS = (
+    ('temperature', operator.gt, 'temp_max', 'high', 'HIGH TEMPERATURE', '°C'),
+    ('temperature', operator.lt, 'temp_min', 'low', 'LOW TEMPERATURE', '°C'),
+    ('humidity', operator.gt, 'humidity_max', 'high', 'HIGH HUMIDITY', '%'),
+    ('humidity', operator.lt, 'humidity_min', 'low', 'LOW HUMIDITY', '%'),
+    ('air_quality', operator.gt, 'air_quality_max', 'high', 'POOR AIR QUALITY', '%'),
+)
+
 ALERT_COOLDOWN = int(os.getenv('ALERT_COOLDOWN_MINUTES', 15))
+ALERT_COOLDOWN_S = ALERT_COOLDOWN * 60
+
+# Server workers. Without REDIS_URL, readings, alert history and alert settings
+# live in process memory and each worker keeps its own copy; set REDIS_URL
+# before raising this.
+WORKERS = int(os.getenv('UVICORN_WORKERS', 1))
 
 # -----------------------------
 # Data Models
@@ -90,6 +158,32 @@ class SensorData(BaseModel):
 class SensorDataWithTimestamp(SensorData):
     timestamp: datetime
 
+class SensorDataResponse(BaseModel):
+    status: str
+    data: Optional[SensorDataWithTimestamp] = None
+    message: Optional[str] = None
+
+@dataclass(slots=True)
+class SensorReading:
+    """Stored reading. Fields are already coerced by the POST handler, so this
+    skips Pydantic validation; the models above only describe the API in OpenAPI."""
+    device_id: str
+    temperature: float
+    humidity: float
+    air_quality: float
+    air_quality_raw: int
+    timestamp: datetime
+
+    def to_dict(self) -> dict:
+        return {
+            'device_id': self.device_id,
+            'temperature': self.temperature,
+            'humidity': self.humidity,
+            'air_quality': self.air_quality,
+            'air_quality_raw': self.air_quality_raw,
+            'timestamp': self.timestamp,
+        }
+
 class AlertSettings(BaseModel):
     enabled: bool
     alert_method: str  # "sms", "call", or "both"
@@ -111,11 +205,22 @@ class AlertHistory(BaseModel):
 # -----------------------------
 # Global State
 # -----------------------------
-sensor_readings: List[SensorDataWithTimestamp] = []
-alert_history: List[AlertHistory] = []
-last_alert_time: Dict[str, datetime] = {}
 MAX_READINGS = 100
 MAX_ALERTS = 50
+# Bounded ring buffers: append() evicts the oldest entry in O(1)
+sensor_readings: Deque[SensorReading] = deque(maxlen=MAX_READINGS)
+# orjson bytes of each entry in sensor_readings, serialized once at insert
+sensor_readings_json: Deque[bytes] = deque(maxlen=MAX_READINGS)
+alert_history: Deque[AlertHistory] = deque(maxlen=MAX_ALERTS)
+# time.monotonic() of the last alert sent per '<sensor>_<type>' key
+last_alert_time: Dict[str, float] = {}
+
+# Rolling float32 copies of the numeric fields, kept in step with
+# sensor_readings so /statistics can use NumPy reductions.
+# Rows: temperature, humidity, air_quality
+_stats_buf = np.empty((3, MAX_READINGS), dtype=np.float32)
+_head = 0
+_count = 0
 
 # Alert settings (can be modified via API)
 alert_settings = {
@@ -124,130 +229,240 @@ alert_settings = {
     **THRESHOLDS
 }
 
+def record_stats(reading: SensorReading):
+    """Write a reading's numeric fields into the statistics ring buffers"""
+    global _head, _count
+    _stats_buf[:, _head] = (reading.temperature, reading.humidity, reading.air_quality)
+    _head = (_head + 1) % MAX_READINGS
+    _count = min(_count + 1, MAX_READINGS)
+
+def reset_stats():
+    """Empty the statistics ring buffers"""
+    global _head, _count
+    _head = 0
+    _count = 0
+
+# -----------------------------
+# Storage
+# -----------------------------
+# With Redis configured, readings, alert history, cooldowns and alert settings
+# are kept in Redis lists/keys (newest first, bounded with LTRIM) so every
+# worker shares them. Otherwise the in-process state above is used.
+async def load_alert_settings() -> dict:
+    """Current alert settings; fields never saved fall back to the defaults"""
+    if redis_client:
+        raw = await redis_client.hgetall(SETTINGS_KEY)
+        return {**alert_settings, **{k.decode(): orjson.loads(v) for k, v in raw.items()}}
+    return alert_settings
+
+async def save_alert_settings(new_settings: dict) -> dict:
+    if redis_client:
+        await redis_client.hset(SETTINGS_KEY, mapping={k: orjson.dumps(v) for k, v in new_settings.items()})
+        return {**alert_settings, **new_settings}
+    alert_settings.update(new_settings)
+    return alert_settings
+
+async def store_reading(reading: SensorReading):
+    """Append a reading, evicting the oldest beyond MAX_READINGS"""
+    data = orjson.dumps(reading.to_dict())
+    if redis_client:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            await pipe.lpush(READINGS_KEY, data).ltrim(READINGS_KEY, 0, MAX_READINGS - 1).execute()
+        return
+    sensor_readings.append(reading)
+    sensor_readings_json.append(data)
+    record_stats(reading)
+
+async def reading_count() -> int:
+    if redis_client:
+        return await redis_client.llen(READINGS_KEY)
+    return len(sensor_readings)
+
+async def latest_reading() -> Optional[dict]:
+    if redis_client:
+        raw = await redis_client.lindex(READINGS_KEY, 0)
+        return orjson.loads(raw) if raw else None
+    return sensor_readings[-1].to_dict() if sensor_readings else None
+
+async def recent_readings_json(limit: Optional[int]) -> list:
+    """Serialized JSON of up to `limit` most recent readings (all if falsy),
+    oldest first"""
+    if redis_client:
+        raw = await redis_client.lrange(READINGS_KEY, 0, (limit or 0) - 1)
+        raw.reverse()
+        return raw
+    start = max(0, len(sensor_readings_json) - limit) if limit else 0
+    return list(islice(sensor_readings_json, start, None))
+
+async def stats_view() -> np.ndarray:
+    """(3, n) float32 array of temperature, humidity and air_quality"""
+    if redis_client:
+        raw = await redis_client.lrange(READINGS_KEY, 0, -1)
+        rows = [(d['temperature'], d['humidity'], d['air_quality']) for d in map(orjson.loads, raw)]
+        return np.array(rows, dtype=np.float32).reshape(-1, 3).T
+    # Order doesn't matter for min/avg/max, so the first _count columns are
+    # the valid region whether or not the ring has wrapped
+    return _stats_buf[:, :_count]
+
+async def clear_readings() -> int:
+    if redis_client:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            count, _ = await pipe.llen(READINGS_KEY).delete(READINGS_KEY).execute()
+        return count
+    count = len(sensor_readings)
+    sensor_readings.clear()
+    sensor_readings_json.clear()
+    reset_stats()
+    return count
+
+async def store_alert(record: AlertHistory):
+    if redis_client:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            await pipe.lpush(ALERTS_KEY, orjson.dumps(record.model_dump())).ltrim(ALERTS_KEY, 0, MAX_ALERTS - 1).execute()
+        return
+    alert_history.append(record)
+
+async def recent_alerts(limit: Optional[int]) -> list:
+    """Up to `limit` most recent alerts (all if falsy), oldest first"""
+    if redis_client:
+        raw = await redis_client.lrange(ALERTS_KEY, 0, (limit or 0) - 1)
+        return [orjson.loads(a) for a in reversed(raw)]
+    start = max(0, len(alert_history) - limit) if limit else 0
+    return [a.model_dump() for a in islice(alert_history, start, None)]
+
+async def claim_cooldown(alert_key: str, now: float) -> bool:
+    """Start the cooldown for alert_key unless one is already running.
+    Returns False while on cooldown. Called before any await so concurrent
+    alert tasks can't both pass the check."""
+    if redis_client:
+        if ALERT_COOLDOWN_S <= 0:
+            return True
+        # SET NX is atomic across workers; Redis expires the key itself once
+        # the cooldown is over
+        return bool(await redis_client.set(COOLDOWN_PREFIX + alert_key, 1, nx=True, ex=ALERT_COOLDOWN_S))
+    last = last_alert_time.get(alert_key)
+    if last is not None and now - last < ALERT_COOLDOWN_S:
+        return False
+    last_alert_time[alert_key] = now
+    return True
+
+async def release_cooldown(alert_key: str):
+    """Undo claim_cooldown after a failed send so the next reading retries"""
+    if redis_client:
+        await redis_client.delete(COOLDOWN_PREFIX + alert_key)
+        return
+    last_alert_time.pop(alert_key, None)
+
+async def clear_alerts_state() -> int:
+    """Drop alert history and cooldowns, returning the number of alerts removed"""
+    if redis_client:
+        cooldown_keys = [k async for k in redis_client.scan_iter(match=COOLDOWN_PREFIX + '*')]
+        async with redis_client.pipeline(transaction=True) as pipe:
+            count, *_ = await pipe.llen(ALERTS_KEY).delete(ALERTS_KEY, *cooldown_keys).execute()
+        return count
+    count = len(alert_history)
+    alert_history.clear()
+    last_alert_time.clear()
+    return count
+
 # -----------------------------
 # Twilio Functions
 # -----------------------------
-def send_sms_alert(message: str) -> bool:
-    """Send SMS alert via Twilio"""
+async def send_sms_alert(message: str) -> bool:
+    """Send SMS alert via Twilio (blocking client call runs in a worker thread)"""
     if not twilio_client or not TWILIO_PHONE_NUMBER or not ALERT_PHONE_NUMBER:
-        print("⚠ SMS not sent: Twilio not configured")
+        logger.warning("⚠ SMS not sent: Twilio not configured")
         return False
     
     try:
         from twilio.base.exceptions import TwilioRestException
-        message_obj = twilio_client.messages.create(
+        message_obj = await asyncio.to_thread(
+            twilio_client.messages.create,
             body=message,
             from_=TWILIO_PHONE_NUMBER,
             to=ALERT_PHONE_NUMBER
         )
-        print(f"✅ SMS sent successfully: {message_obj.sid}")
+        logger.info("✅ SMS sent successfully: %s", message_obj.sid)
         return True
     except Exception as e:
-        print(f"❌ Failed to send SMS: {e}")
+        logger.error("❌ Failed to send SMS: %s", e)
         return False
 
-def make_voice_call(message: str) -> bool:
-    """Make voice call via Twilio with TwiML"""
+async def make_voice_call(message: str) -> bool:
+    """Make voice call via Twilio with TwiML (blocking client call runs in a worker thread)"""
     if not twilio_client or not TWILIO_PHONE_NUMBER or not ALERT_PHONE_NUMBER:
-        print("⚠ Call not made: Twilio not configured")
+        logger.warning("⚠ Call not made: Twilio not configured")
         return False
     
     try:
         from twilio.base.exceptions import TwilioRestException
         # Create TwiML for voice message
-        twiml = f'<Response><Say voice="alice">{message}</Say><Pause length="1"/><Say voice="alice">This is an automated alert from your IoT sensor system. Please check your dashboard immediately.</Say></Response>'
+        twiml = TWIML_TEMPLATE.format(html.escape(message))
         
-        call = twilio_client.calls.create(
+        call = await asyncio.to_thread(
+            twilio_client.calls.create,
             twiml=twiml,
             to=ALERT_PHONE_NUMBER,
             from_=TWILIO_PHONE_NUMBER
         )
-        print(f"✅ Call initiated successfully: {call.sid}")
+        logger.info("✅ Call initiated successfully: %s", call.sid)
         return True
     except Exception as e:
-        print(f"❌ Failed to make call: {e}")
+        logger.error("❌ Failed to make call: %s", e)
         return False
 
-def check_and_send_alerts(reading: SensorDataWithTimestamp):
-    """Check sensor readings against thresholds and send alerts"""
-    if not alert_settings['enabled']:
+async def check_and_send_alerts(reading: SensorReading):
+    """Check sensor readings against thresholds and send alerts.
+    Runs as a background task after the POST response has been sent."""
+    settings = await load_alert_settings()
+    if not settings['enabled']:
         return
     
     alerts_to_send = []
     
-    # Check temperature
-    if reading.temperature > alert_settings['temp_max']:
-        alerts_to_send.append({
-            'sensor': 'temperature',
-            'type': 'high',
-            'value': reading.temperature,
-            'threshold': alert_settings['temp_max'],
-            'message': f"HIGH TEMPERATURE ALERT! Current: {reading.temperature}°C, Threshold: {alert_settings['temp_max']}°C"
-        })
-    elif reading.temperature < alert_settings['temp_min']:
-        alerts_to_send.append({
-            'sensor': 'temperature',
-            'type': 'low',
-            'value': reading.temperature,
-            'threshold': alert_settings['temp_min'],
-            'message': f"LOW TEMPERATURE ALERT! Current: {reading.temperature}°C, Threshold: {alert_settings['temp_min']}°C"
-        })
+    for sensor, cmp, key, alert_type, label, unit in ALERT_CHECKS:
+        value = getattr(reading, sensor)
+        threshold = settings[key]
+        if cmp(value, threshold):
+            alerts_to_send.append({
+                'sensor': sensor,
+                'type': alert_type,
+                'value': value,
+                'threshold': threshold,
+                'message': f"{label} ALERT! Current: {value}{unit}, Threshold: {threshold}{unit}"
+            })
     
-    # Check humidity
-    if reading.humidity > alert_settings['humidity_max']:
-        alerts_to_send.append({
-            'sensor': 'humidity',
-            'type': 'high',
-            'value': reading.humidity,
-            'threshold': alert_settings['humidity_max'],
-            'message': f"HIGH HUMIDITY ALERT! Current: {reading.humidity}%, Threshold: {alert_settings['humidity_max']}%"
-        })
-    elif reading.humidity < alert_settings['humidity_min']:
-        alerts_to_send.append({
-            'sensor': 'humidity',
-            'type': 'low',
-            'value': reading.humidity,
-            'threshold': alert_settings['humidity_min'],
-            'message': f"LOW HUMIDITY ALERT! Current: {reading.humidity}%, Threshold: {alert_settings['humidity_min']}%"
-        })
+    if not alerts_to_send:
+        return
     
-    # Check air quality
-    if reading.air_quality > alert_settings['air_quality_max']:
-        alerts_to_send.append({
-            'sensor': 'air_quality',
-            'type': 'high',
-            'value': reading.air_quality,
-            'threshold': alert_settings['air_quality_max'],
-            'message': f"POOR AIR QUALITY ALERT! Current: {reading.air_quality}%, Threshold: {alert_settings['air_quality_max']}%"
-        })
+    # Hoisted out of the send loop: one clock read and lookup per call
+    now = time.monotonic()
+    method = settings['alert_method']
     
     # Send alerts with cooldown
     for alert in alerts_to_send:
         alert_key = f"{alert['sensor']}_{alert['type']}"
-        current_time = datetime.now()
         
-        # Check cooldown
-        if alert_key in last_alert_time:
-            time_since_last = current_time - last_alert_time[alert_key]
-            if time_since_last < timedelta(minutes=ALERT_COOLDOWN):
-                print(f"⏱ Alert cooldown active for {alert_key}. Skipping.")
-                continue
+        # Claim the cooldown up front; the sends below take hundreds of ms
+        if not await claim_cooldown(alert_key, now):
+            logger.info("⏱ Alert cooldown active for %s. Skipping.", alert_key)
+            continue
         
         # Send alert based on method
-        method = alert_settings['alert_method']
         success = False
         
         if method in ['sms', 'both']:
-            success = send_sms_alert(alert['message'])
+            success = await send_sms_alert(alert['message'])
         
         if method in ['call', 'both']:
-            success = make_voice_call(alert['message']) or success
+            success = await make_voice_call(alert['message']) or success
         
         # Record alert
-        if success:
-            last_alert_time[alert_key] = current_time
+        if not success:
+            await release_cooldown(alert_key)
+        else:
             alert_record = AlertHistory(
-                timestamp=current_time,
+                timestamp=datetime.now(),
                 alert_type=alert['type'],
                 sensor=alert['sensor'],
                 value=alert['value'],
@@ -255,31 +470,34 @@ def check_and_send_alerts(reading: SensorDataWithTimestamp):
                 method=method,
                 status='sent'
             )
-            alert_history.append(alert_record)
-            if len(alert_history) > MAX_ALERTS:
-                alert_history.pop(0)
+            await store_alert(alert_record)
 
 # -----------------------------
 # Routes
 # -----------------------------
 @app.get("/")
-def root():
+async def root():
     twilio_status = "configured" if twilio_client else "not configured"
+    settings = await load_alert_settings()
     return {
         "status": "online",
         "message": "IoT Sensor API with Twilio Alerts",
-        "total_readings": len(sensor_readings),
+        "total_readings": await reading_count(),
         "twilio_status": twilio_status,
-        "alerts_enabled": alert_settings['enabled']
+        "alerts_enabled": settings['enabled']
     }
 
-@app.post("/sensor-data")
-async def receive_sensor_data(request: Request):
+@app.post(
+    "/sensor-data",
+    responses={200: {"model": SensorDataResponse}},
+    # The body is read from the raw request, so document it explicitly
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": SensorData.model_json_schema()}}}},
+)
+async def receive_sensor_data(request: Request, background_tasks: BackgroundTasks):
     try:
         payload = await request.json()
-        print(f"📩 Incoming payload: {payload}")
 
-        reading = SensorDataWithTimestamp(
+        reading = SensorReading(
             device_id=str(payload.get("device_id", "unknown")),
             temperature=float(payload.get("temperature", 0)),
             humidity=float(payload.get("humidity", 0)),
@@ -288,83 +506,87 @@ async def receive_sensor_data(request: Request):
             timestamp=datetime.now(),
         )
 
-        sensor_readings.append(reading)
-        if len(sensor_readings) > MAX_READINGS:
-            sensor_readings.pop(0)
+        await store_reading(reading)
 
-        print(f"✅ Stored reading from {reading.device_id} @ {reading.timestamp}")
+        logger.debug("✅ Stored reading from %s @ %s", reading.device_id, reading.timestamp)
         
-        # Check for alerts
-        check_and_send_alerts(reading)
+        # Check for alerts without holding up the response
+        background_tasks.add_task(check_and_send_alerts, reading)
 
-        return {"status": "success", "data": reading.dict()}
+        return {"status": "success", "data": reading.to_dict()}
 
     except Exception as e:
-        print("❌ Error:", e)
+        logger.error("❌ Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/latest-reading")
-def get_latest():
-    if not sensor_readings:
+@app.get("/latest-reading", responses={200: {"model": SensorDataResponse}})
+async def get_latest():
+    latest = await latest_reading()
+    if latest is None:
         return {"status": "no_data", "message": "No readings yet"}
-    return {"status": "success", "data": sensor_readings[-1].dict()}
+    return {"status": "success", "data": latest}
 
 @app.get("/readings")
-def get_all(limit: Optional[int] = 50):
-    readings = sensor_readings[-limit:] if sensor_readings else []
-    readings_out = [r.dict() for r in readings]
-    return {"status": "success", "count": len(readings_out), "readings": readings_out}
+async def get_all(limit: Optional[int] = Query(50, ge=0)):
+    # Readings were serialized when stored, so the body is just joined bytes
+    readings_out = await recent_readings_json(limit)
+    body = b'{"status":"success","count":%d,"readings":[%b]}' % (len(readings_out), b",".join(readings_out))
+    return Response(body, media_type="application/json")
 
 @app.get("/statistics")
-def get_statistics():
-    if not sensor_readings:
+async def get_statistics():
+    view = await stats_view()
+    if not view.shape[1]:
         return {"status": "no_data", "message": "No readings yet"}
 
-    temps = [r.temperature for r in sensor_readings]
-    hums = [r.humidity for r in sensor_readings]
-    aqs = [r.air_quality for r in sensor_readings]
+    # One reduction per statistic covers all three sensors at once
+    mins = view.min(axis=1).tolist()
+    avgs = view.mean(axis=1).tolist()
+    maxs = view.max(axis=1).tolist()
 
-    def stats(arr):
-        return {"min": round(min(arr), 2), "avg": round(sum(arr)/len(arr), 2), "max": round(max(arr), 2)}
+    def stats(i):
+        return {"min": round(mins[i], 2), "avg": round(avgs[i], 2), "max": round(maxs[i], 2)}
 
     return {
         "status": "success",
-        "temperature": stats(temps),
-        "humidity": stats(hums),
-        "air_quality": stats(aqs),
+        "temperature": stats(0),
+        "humidity": stats(1),
+        "air_quality": stats(2),
     }
 
 @app.get("/alert-settings")
-def get_alert_settings():
+async def get_alert_settings():
     """Get current alert settings"""
     return {
         "status": "success",
-        "settings": alert_settings,
+        "settings": await load_alert_settings(),
         "twilio_configured": twilio_client is not None
     }
 
 @app.put("/alert-settings")
 async def update_alert_settings(settings: AlertSettings):
     """Update alert settings"""
-    alert_settings['enabled'] = settings.enabled
-    alert_settings['alert_method'] = settings.alert_method
-    alert_settings['temp_max'] = settings.temp_max
-    alert_settings['temp_min'] = settings.temp_min
-    alert_settings['humidity_max'] = settings.humidity_max
-    alert_settings['humidity_min'] = settings.humidity_min
-    alert_settings['air_quality_max'] = settings.air_quality_max
+    updated = await save_alert_settings({
+        'enabled': settings.enabled,
+        'alert_method': settings.alert_method,
+        'temp_max': settings.temp_max,
+        'temp_min': settings.temp_min,
+        'humidity_max': settings.humidity_max,
+        'humidity_min': settings.humidity_min,
+        'air_quality_max': settings.air_quality_max,
+    })
     
-    print(f"⚙ Alert settings updated: {alert_settings}")
-    return {"status": "success", "settings": alert_settings}
+    logger.info("⚙ Alert settings updated: %s", updated)
+    return {"status": "success", "settings": updated}
 
 @app.get("/alert-history")
-def get_alert_history(limit: Optional[int] = 20):
+async def get_alert_history(limit: Optional[int] = Query(20, ge=0)):
     """Get alert history"""
-    alerts = alert_history[-limit:] if alert_history else []
+    alerts = await recent_alerts(limit)
     return {
         "status": "success",
         "count": len(alerts),
-        "alerts": [a.dict() for a in alerts]
+        "alerts": alerts
     }
 
 @app.post("/test-alert")
@@ -377,10 +599,10 @@ async def test_alert(method: str = "both"):
     
     success = False
     if method in ['sms', 'both']:
-        success = send_sms_alert(test_message)
+        success = await send_sms_alert(test_message)
     
     if method in ['call', 'both']:
-        success = make_voice_call(test_message) or success
+        success = await make_voice_call(test_message) or success
     
     return {
         "status": "success" if success else "error",
@@ -388,26 +610,22 @@ async def test_alert(method: str = "both"):
     }
 
 @app.get("/dashboard")
-def dashboard():
-    if frontend_path and os.path.isdir(frontend_path):
-        html_path = os.path.join(frontend_path, 'dashboard.html')
-        if os.path.isfile(html_path):
-            return FileResponse(html_path, media_type='text/html')
+async def dashboard(request: Request):
+    if _DASHBOARD_BYTES is not None:
+        headers = {"Cache-Control": "max-age=60", "ETag": _DASHBOARD_ETAG}
+        if request.headers.get("if-none-match") == _DASHBOARD_ETAG:
+            return Response(status_code=304, headers=headers)
+        return Response(_DASHBOARD_BYTES, media_type='text/html', headers=headers)
     return {"status": "error", "message": "Dashboard not found. Make sure frontend/dashboard.html exists"}
 
 @app.delete("/readings")
-def clear():
-    global sensor_readings
-    count = len(sensor_readings)
-    sensor_readings = []
+async def clear():
+    count = await clear_readings()
     return {"status": "success", "message": f"Cleared {count} readings"}
 
 @app.delete("/alert-history")
-def clear_alerts():
-    global alert_history, last_alert_time
-    count = len(alert_history)
-    alert_history = []
-    last_alert_time = {}
+async def clear_alerts():
+    count = await clear_alerts_state()
     return {"status": "success", "message": f"Cleared {count} alerts"}
 
 # -----------------------------
@@ -417,10 +635,22 @@ if __name__ == "__main__":
     print("\n" + "="*60)
     print("🚀 Starting FastAPI server with Twilio Integration...")
     print("="*60)
-    print("📡 Listening on http://0.0.0.0:8000")
+    print(f"📡 Listening on http://0.0.0.0:8000 ({WORKERS} worker{'s' if WORKERS > 1 else ''})")
     print("📊 API Docs: http://localhost:8000/docs")
-    print("🖥  Dashboard: http://localhost:8000/dashboard")
+    print(f"🖥  Dashboard: {'http://localhost:8000/dashboard' if _DASHBOARD_BYTES is not None else '❌ frontend/dashboard.html not found'}")
+    print(f"💾 Storage: {'Redis' if redis_client else 'In-memory'}")
     print(f"📱 Twilio Status: {'✅ Configured' if twilio_client else '❌ Not Configured'}")
     print(f"🔔 Alerts: {'✅ Enabled' if alert_settings['enabled'] else '❌ Disabled'}")
     print("="*60 + "\n")
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
\ No newline at end of file
+    # Multiple workers need an import string so each process can load the app
+    uvicorn.run(
+        "main:app" if WORKERS > 1 else app,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        workers=WORKERS,
+        log_level="warning",
+        access_log=False,
+    )
\ No newline at end of file
@@ -1,28 +1,62 @@
 """
 Simple simulator that POSTs random sensor readings to the backend every 5 seconds.
 Run alongside the FastAPI server to emulate the ESP32.
+Set SIM_DEVICES to emulate several ESP32s concurrently over one pooled client.
 """
-import time
-import random
-import requests
+import asyncio
+import os
+import httpx
+import numpy as np
 
-URL = 'http://127.0.0.1:8000/sensor-data'
+BASE_URL = 'http://127.0.0.1:8000'
+ENDPOINT = '/sensor-data'
+INTERVAL = 5
+NUM_DEVICES = int(os.getenv('SIM_DEVICES', 1))
+BATCH = 1000
 
-print('Simulator ready. Posting to', URL)
-try:
+# Columns: temperature, humidity, air_quality -> value = offset + random * span
+OFFSETS = np.array([20.0, 30.0, 0.0])
+SPANS = np.array([10.0, 50.0, 50.0])
+
+
+def sample_readings():
+    """Yield (temperature, humidity, air_quality, air_quality_raw) tuples,
+    drawing random values BATCH rows at a time"""
+    rng = np.random.default_rng()
     while True:
+        values = np.round(OFFSETS + rng.random((BATCH, 3)) * SPANS, 2).tolist()
+        raws = rng.integers(200, 3000, size=BATCH, endpoint=True).tolist()
+        for (temperature, humidity, air_quality), raw in zip(values, raws):
+            yield temperature, humidity, air_quality, raw
+
+
+async def run_device(client: httpx.AsyncClient, device_id: str, readings):
+    for temperature, humidity, air_quality, raw in readings:
         payload = {
-            'device_id': 'SIM_ESP32',
-            'temperature': round(20 + random.random() * 10, 2),
-            'humidity': round(30 + random.random() * 50, 2),
-            'air_quality': round(random.random() * 50, 2),
-            'air_quality_raw': random.randint(200, 3000)
+            'device_id': device_id,
+            'temperature': temperature,
+            'humidity': humidity,
+            'air_quality': air_quality,
+            'air_quality_raw': raw
         }
         try:
-            r = requests.post(URL, json=payload, timeout=5)
+            r = await client.post(ENDPOINT, json=payload)
             print('POST', r.status_code, payload)
         except Exception as e:
             print('POST error:', e)
-        time.sleep(5)
+        await asyncio.sleep(INTERVAL)
+
+
+async def main():
+    # One client keeps connections alive instead of a new handshake per POST
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=5.0) as client:
+        device_ids = ['SIM_ESP32'] if NUM_DEVICES == 1 else [f'SIM_ESP32_{i}' for i in range(NUM_DEVICES)]
+        readings = sample_readings()
+        await asyncio.gather(*(run_device(client, d, readings) for d in device_ids))
+
+
+print('Simulator ready. Posting to', BASE_URL + ENDPOINT)
+try:
+    asyncio.run(main())
 except KeyboardInterrupt:
     print('Simulator stopped')